@@ -0,0 +1,96 @@
+import time
+import threading
+from datetime import timezone
+from opcua import ua
+
+# === PLC cycletime meten via OPC UA (vervangt de handmatige TIA trace-export) ===
+# De TIA trace "CycleTimeMeasurement.CycleTimeInfo" (waarde in ns) wordt hier
+# rechtstreeks uit de PLC gelezen, zodat elke meting zijn eigen cycletime krijgt
+# en de analyse niet meer op dichtstbijzijnde tijdstempel hoeft te koppelen.
+CYCLETIME_NODE_ID = 'ns=3;s="CycleTimeMeasurement"."CycleTimeInfo"'
+CYCLETIME_INTERVAL_MS = 10    # publishing/sampling interval van de subscription
+
+# Modi: None (uit), "subscription" (eigen snelle subscription) of
+# "read" (meelezen in dezelfde Read-request als de echo)
+MODI = (None, "subscription", "read")
+
+CSV_KOLOMMEN = ["cycletime_ns", "cycletime_tijd_unix_ms"]
+
+
+def _tijd_unix_ms(datavalue):
+    tijdstempel = datavalue.SourceTimestamp or datavalue.ServerTimestamp
+    if tijdstempel is None:
+        return int(time.time() * 1000)
+    # OPC UA tijdstempels zijn naïeve UTC datetimes
+    return int(tijdstempel.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class CycleTimeMonitor:
+    """Houdt de laatst bekende PLC-cycletime bij, gevoed door een subscription of door Reads."""
+
+    def __init__(self, client, modus, node_id=CYCLETIME_NODE_ID, interval_ms=CYCLETIME_INTERVAL_MS):
+        if modus not in MODI:
+            raise ValueError(f"Onbekende cycletime-modus: {modus}")
+        self.client = client
+        self.modus = modus
+        self.node = client.get_node(node_id) if modus else None
+        self.interval_ms = interval_ms
+        self._lock = threading.Lock()
+        self._laatste = (None, None)
+        self._sub = None
+        self._handle = None
+
+    @property
+    def actief(self):
+        return self.modus is not None
+
+    def start(self):
+        if self.modus == "subscription":
+            self._sub = self.client.create_subscription(self.interval_ms, self)
+            # queuesize > 1 zodat snelle cycli tussen twee publish-berichten niet verloren gaan
+            self._handle = self._sub.subscribe_data_change(self.node, queuesize=10)
+            print(f"[✓] Cycletime-subscription actief ({self.interval_ms} ms)")
+        return self
+
+    def stop(self):
+        if self._sub is not None:
+            try:
+                self._sub.unsubscribe(self._handle)
+                self._sub.delete()
+            except Exception:
+                pass
+            self._sub = None
+
+    # Subscription handler
+    def datachange_notification(self, node, val, data):
+        self._bijwerken(val, _tijd_unix_ms(data.monitored_item.Value))
+
+    def _bijwerken(self, waarde, tijd_unix_ms):
+        with self._lock:
+            self._laatste = (waarde, tijd_unix_ms)
+
+    def laatste(self):
+        """Geeft [cycletime_ns, cycletime_tijd_unix_ms] van de laatst ontvangen waarde."""
+        with self._lock:
+            return list(self._laatste)
+
+    def lees(self, nodes):
+        """
+        Leest de waarden van `nodes` in één Read-request. In "read"-modus wordt de
+        cycletime-node in dezelfde request meegenomen. Een Bad status van een van
+        `nodes` geeft, net als Node.get_value(), een UaStatusCodeError.
+        """
+        nodeids = [node.nodeid for node in nodes]
+        if self.modus == "read":
+            nodeids.append(self.node.nodeid)
+        results = self.client.uaclient.get_attributes(nodeids, ua.AttributeIds.Value)
+        if self.modus == "read":
+            cyclus = results.pop()
+            # Een mislukte cycletime-read laat de meting zelf niet mislukken
+            if cyclus.StatusCode.is_good():
+                self._bijwerken(cyclus.Value.Value, _tijd_unix_ms(cyclus))
+            else:
+                self._bijwerken(None, None)
+        for result in results:
+            result.StatusCode.check()
+        return [result.Value.Value for result in results]
@@ -0,0 +1,169 @@
+import json
+import time
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# === Live metrics tijdens lange testruns ===
+# De meetthreads registreren alleen (tijd, duur, ok) in een deque; een
+# achtergrondthread rekent elke seconde per client en operatie de ops/s, fouten
+# en latency-percentielen uit over een voortschrijdend venster. Het resultaat is
+# te volgen via een lokaal HTTP-endpoint in Prometheus-tekstformaat en/of als
+# JSON-regels in een append-only bestand.
+# De scripts gebruiken poorten 18100-18103: 9100-9103 zijn in gebruik bij
+# standaard Prometheus-exporters (node_exporter e.d.).
+METRICS_HOST = "127.0.0.1"
+VENSTER_S = 10          # voortschrijdend venster voor ops/s en percentielen
+INTERVAL_S = 1.0        # verversingsinterval
+PERCENTIELEN = (0.5, 0.95, 0.99)
+
+
+def _percentiel(gesorteerd, q):
+    return gesorteerd[min(len(gesorteerd) - 1, int(q * len(gesorteerd)))]
+
+
+class LiveMetrics:
+    """Verzamelt per (client, operatie) metingen en publiceert ze elke seconde."""
+
+    def __init__(self, poort=None, bestand=None, host=METRICS_HOST, venster_s=VENSTER_S):
+        self.poort = poort
+        self.bestand = bestand
+        self.host = host
+        self.venster_s = venster_s
+        self._lock = threading.Lock()
+        self._metingen = {}     # (client, operatie) -> deque[(monotonic, duur_s, ok)]
+        self._totalen = {}      # (client, operatie) -> [aantal, fouten]
+        self._tekst = b""
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+        self._start = None
+
+    @property
+    def actief(self):
+        return self.poort is not None or self.bestand is not None
+
+    def registreer(self, client, operatie, duur_s, ok=True):
+        """Hot path: alleen een append onder een lock, geen I/O."""
+        if not self.actief:
+            return
+        sleutel = (client, operatie)
+        with self._lock:
+            rij = self._metingen.get(sleutel)
+            if rij is None:
+                rij = self._metingen[sleutel] = deque()
+                self._totalen[sleutel] = [0, 0]
+            rij.append((time.monotonic(), duur_s, ok))
+            totaal = self._totalen[sleutel]
+            totaal[0] += 1
+            if not ok:
+                totaal[1] += 1
+
+    def start(self):
+        if not self.actief:
+            return self
+        self._start = time.monotonic()
+        if self.poort is not None:
+            try:
+                self._server = ThreadingHTTPServer((self.host, self.poort), self._maak_handler())
+                threading.Thread(target=self._server.serve_forever, daemon=True).start()
+                print(f"[✓] Live metrics op http://{self.host}:{self.poort}/metrics")
+            except OSError as e:
+                print(f"[⚠️] Metrics-poort {self.poort} niet beschikbaar: {e}")
+        if self.bestand:
+            print(f"[✓] Live metrics naar '{self.bestand}'")
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if not self.actief:
+            return
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self._bijwerken()   # laatste stand nog wegschrijven
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _loop(self):
+        while not self._stop.wait(INTERVAL_S):
+            self._bijwerken()
+
+    def _samenvatting(self):
+        nu = time.monotonic()
+        grens = nu - self.venster_s
+        # Tijdens de eerste seconden (en bij een korte run) is het venster nog niet vol
+        duur_s = max(min(self.venster_s, nu - (self._start or nu)), INTERVAL_S)
+        samenvatting = []
+        with self._lock:
+            for sleutel, rij in self._metingen.items():
+                while rij and rij[0][0] < grens:
+                    rij.popleft()
+                samenvatting.append((sleutel, list(rij), list(self._totalen[sleutel])))
+
+        resultaat = []
+        for (client, operatie), rij, (aantal, fouten) in samenvatting:
+            duren = sorted(duur for _, duur, ok in rij if ok)
+            resultaat.append({
+                "client": client,
+                "operatie": operatie,
+                "ops_s": len(rij) / duur_s,
+                "fouten_venster": sum(1 for _, _, ok in rij if not ok),
+                "aantal_totaal": aantal,
+                "fouten_totaal": fouten,
+                "latency_s": {q: _percentiel(duren, q) for q in PERCENTIELEN} if duren else {},
+            })
+        return resultaat
+
+    def _bijwerken(self):
+        samenvatting = self._samenvatting()
+        if self.poort is not None:
+            self._tekst = self._prometheus(samenvatting).encode()
+        if self.bestand and samenvatting:
+            tijd_unix_ms = int(time.time() * 1000)
+            with open(self.bestand, "a") as file:
+                for s in samenvatting:
+                    regel = {"tijd_unix_ms": tijd_unix_ms, **s,
+                             "latency_s": {str(q): v for q, v in s["latency_s"].items()}}
+                    file.write(json.dumps(regel) + "\n")
+
+    @staticmethod
+    def _prometheus(samenvatting):
+        # Per metric-familie eerst de TYPE-regel en daarna al haar samples
+        families = [
+            ("opcua_ops_per_second", "gauge", lambda s: [("", f"{s['ops_s']:.3f}")]),
+            ("opcua_errors_window", "gauge", lambda s: [("", s["fouten_venster"])]),
+            ("opcua_operations_total", "counter", lambda s: [("", s["aantal_totaal"])]),
+            ("opcua_errors_total", "counter", lambda s: [("", s["fouten_totaal"])]),
+            ("opcua_latency_seconds", "summary",
+             lambda s: [(f',quantile="{q}"', f"{waarde:.6f}") for q, waarde in s["latency_s"].items()]),
+        ]
+        regels = []
+        for naam, soort, samples in families:
+            regels.append(f"# TYPE {naam} {soort}")
+            for s in samenvatting:
+                labels = f'client="{s["client"]}",operatie="{s["operatie"]}"'
+                for extra, waarde in samples(s):
+                    regels.append(f"{naam}{{{labels}{extra}}} {waarde}")
+        return "\n".join(regels) + "\n"
+
+    def _maak_handler(self):
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(metrics._tekst)))
+                self.end_headers()
+                self.wfile.write(metrics._tekst)
+
+            def log_message(self, format, *args):
+                pass    # geen regel per scrape op stdout
+
+        return MetricsHandler
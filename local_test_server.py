@@ -0,0 +1,129 @@
+import time
+import threading
+from opcua import Server, ua, uamethod
+
+# === Lokale stand-in voor de PLC ===
+# Biedt dezelfde nodes aan als de testprojecten op de PLC (TestInt/EchoInt,
+# TestArray2, TestBool, cycletime en echo-methode), zodat de testscripts en de
+# security-benchmark zonder PLC gedraaid kunnen worden. Een thread simuleert de
+# PLC-cyclus door TestInt elke cyclus naar EchoInt te kopiëren.
+ENDPOINT = "opc.tcp://127.0.0.1:4840"
+CYCLUS_MS = 10
+
+SIEMENS_NS_URI = "http://www.siemens.com/simatic-s7-opcua"   # ns=3
+INTERFACE_NS_URI = "urn:OPC_UA_Test:ServerInterface"          # ns=4
+
+# (TestInt, EchoInt) zoals in opc_ua_pubsub_based_v20.py
+ECHO_PAREN = [
+    (15, 1637),
+    (16, 1661),
+    (17, 1662),
+    (1650, 1663),
+    (1649, 1664),
+]
+ARRAY_BASE_NODEID_START = 17   # TestArray2[0..99], i=17..116 (zoals plc_attack.py)
+TEST_BOOL_NODEIDS = {"TestBool1": 1110, "TestBool2": 1120}
+
+
+@uamethod
+def echo_methode(parent, waarde):
+    return ua.Variant(waarde, ua.VariantType.Int16)
+
+
+def _int16(parent, nodeid, naam):
+    node = parent.add_variable(ua.NodeId(nodeid, 4), f"4:{naam}", ua.Variant(0, ua.VariantType.Int16))
+    node.set_writable()
+    return node
+
+
+def maak_server(endpoint=ENDPOINT, certificaat=None, private_key=None, policies=None):
+    """
+    Bouwt de stand-in server. Met `certificaat`/`private_key` (paden) en een lijst
+    `policies` (ua.SecurityPolicyType) worden beveiligde endpoints aangeboden.
+    """
+    server = Server()
+    server.set_endpoint(endpoint)
+    server.set_server_name("OPC UA Test stand-in PLC")
+    server.set_application_uri("urn:OPC_UA_Test:standin")
+
+    if certificaat and private_key:
+        server.load_certificate(certificaat)
+        server.load_private_key(private_key)
+    if policies:
+        server.set_security_policy(policies)
+
+    # Namespace-indices gelijk houden aan de PLC (ns=3 Siemens, ns=4 server-interface)
+    server.register_namespace("urn:OPC_UA_Test:ongebruikt")
+    server.register_namespace(SIEMENS_NS_URI)
+    server.register_namespace(INTERFACE_NS_URI)
+
+    # Zelfde structuur als een TIA server-interface: Objects/ServerInterfaces/Server interface_1/DB
+    objects = server.get_objects_node()
+    interfaces = objects.add_folder(ua.NodeId('"ServerInterfaces"', 3), "3:ServerInterfaces")
+    interface = interfaces.add_object(ua.NodeId(2, 4), "4:Server interface_1")
+    db = interface.add_object(ua.NodeId(1, 4), "4:DB")
+
+    paren = []
+    for nummer, (test_id, echo_id) in enumerate(ECHO_PAREN, start=1):
+        paren.append((_int16(db, test_id, f"TestInt{nummer}"), _int16(db, echo_id, f"EchoInt{nummer}")))
+
+    # De oude nummering overlapt (TestInt3 en TestArray2[0] zijn beide i=17); een
+    # array-element dat botst krijgt een vrij NodeId en is via zijn browse-pad te vinden.
+    bezet = {test_id for test_id, _ in ECHO_PAREN} | {echo_id for _, echo_id in ECHO_PAREN}
+    for index in range(100):
+        nodeid = ARRAY_BASE_NODEID_START + index
+        _int16(db, nodeid + 10000 if nodeid in bezet else nodeid, f"TestArray2[{index}]")
+
+    for naam, nodeid in TEST_BOOL_NODEIDS.items():
+        db.add_variable(ua.NodeId(nodeid, 4), f"4:{naam}", False).set_writable()
+
+    meting = objects.add_object(ua.NodeId('"CycleTimeMeasurement"', 3), "3:CycleTimeMeasurement")
+    cyclus = meting.add_variable(ua.NodeId('"CycleTimeMeasurement"."CycleTimeInfo"', 3), "3:CycleTimeInfo",
+                                 ua.Variant(0, ua.VariantType.Int64))
+
+    methode_db = objects.add_object(ua.NodeId('"EchoMethod_DB"', 3), "3:EchoMethod_DB")
+    methode_db.add_method(ua.NodeId('"EchoMethod_DB".Method', 3), "3:Method", echo_methode,
+                          [ua.VariantType.Int16], [ua.VariantType.Int16])
+
+    return server, paren, cyclus
+
+
+def plc_cyclus(paren, cyclus, stop_event, cyclus_ms=CYCLUS_MS):
+    """Simuleert de PLC-scan: kopieert TestInt naar EchoInt en publiceert de cyclustijd."""
+    vorige = time.perf_counter()
+    while not stop_event.is_set():
+        for test_node, echo_node in paren:
+            echo_node.set_value(ua.Variant(test_node.get_value(), ua.VariantType.Int16))
+        nu = time.perf_counter()
+        cyclus.set_value(ua.Variant(int((nu - vorige) * 1e9), ua.VariantType.Int64))
+        vorige = nu
+        stop_event.wait(cyclus_ms / 1000)
+
+
+def start_server(endpoint=ENDPOINT, certificaat=None, private_key=None, policies=None):
+    """Start server en PLC-cyclus; geeft een stopfunctie terug."""
+    server, paren, cyclus = maak_server(endpoint, certificaat, private_key, policies)
+    server.start()
+    stop_event = threading.Event()
+    thread = threading.Thread(target=plc_cyclus, args=(paren, cyclus, stop_event), daemon=True)
+    thread.start()
+    print(f"[✓] Stand-in server actief op {endpoint}")
+
+    def stop():
+        stop_event.set()
+        thread.join(timeout=2.0)
+        server.stop()
+        print("[→] Stand-in server gestopt")
+
+    return stop
+
+
+if __name__ == "__main__":
+    stop = start_server()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop()
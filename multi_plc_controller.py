@@ -0,0 +1,275 @@
+import os
+import csv
+import time
+import random
+import signal
+import threading
+import statistics
+import multiprocessing as mp
+from opcua import Client, ua
+from node_resolver import resolve_nodes
+
+# === OPC UA instellingen per PLC ===
+# Elke PLC draait in een eigen proces, zodat een trage of hangende PLC de
+# metingen op de andere PLC's niet beïnvloedt. Optioneel per PLC: "namespace_uri"
+# van de server-interface, anders zoekt node_resolver.py de namespace zelf op.
+ENDPOINTS = {
+    "Old PLC": {
+        "url": "opc.tcp://172.16.0.1:4840",
+        "test_node": "DB.TestInt1",   # browse-pad of NodeId, zie node_resolver.py
+        "echo_node": "DB.EchoInt1",
+    },
+    "New PLC V3.1": {
+        "url": "opc.tcp://172.16.0.2:4840",
+        "test_node": "DB.TestInt1",
+        "echo_node": "DB.EchoInt1",
+    },
+    "New PLC V4.0": {
+        "url": "opc.tcp://172.16.0.3:4840",
+        "test_node": "DB.TestInt1",
+        "echo_node": "DB.EchoInt1",
+    },
+}
+
+# === Testinstellingen ===
+WORKLOAD = "echo"              # "echo" (write + poll) of "stress" (array-schrijvers)
+AANTAL_METINGEN = 150          # echo: aantal metingen per PLC
+SLEEP_TUSSEN_METINGEN = 0.05   # seconden
+MAX_POGINGEN = 10
+SLEEP_TUSSEN_POLL = 0.001      # 1 ms tussen polling
+STRESS_DUUR = 60               # stress: seconden per PLC
+STRESS_SCHRIJVERS = 5          # stress: aantal schrijf-threads per PLC
+ARRAY_PADEN = [f"DB.TestArray2[{index}]" for index in range(100)]
+CONNECT_TIMEOUT = 30           # seconden om alle PLC's verbonden te krijgen
+START_VERTRAGING = 0.5         # seconden tussen "iedereen klaar" en de gezamenlijke start
+
+# === Uitvoer ===
+OUTPUT_DIR = "multi_plc_results"
+GECOMBINEERD_CSV = "multi_plc_gecombineerd.csv"
+
+ECHO_HEADERS = ["meting_nummer", "tijd_unix_ms", "testwaarde", "echo_waarde", "verschil", "round_trip_seconden"]
+STRESS_HEADERS = ["tijd_unix_ms", "Variable", "Operation", "Value", "Response Time (s)", "Status"]
+
+
+def bestandsnaam(label):
+    return label.replace(" ", "_").replace(".", "_") + ".csv"
+
+
+def wacht_op_start(label, barrier, start_event, start_tijd, stop_event):
+    """Wacht tot alle PLC's verbonden zijn en slaap daarna tot het gezamenlijke starttijdstip."""
+    barrier.wait(timeout=CONNECT_TIMEOUT)
+    if not start_event.wait(timeout=CONNECT_TIMEOUT):
+        raise threading.BrokenBarrierError
+    vertraging = start_tijd.value - time.time()
+    if vertraging > 0:
+        stop_event.wait(vertraging)
+    print(f"[{label}] Start op {start_tijd.value:.3f}")
+
+
+# === Echo workload (zelfde meetlus als opc_ua_read_write_test.py) ===
+def echo_workload(label, nodes, config, stop_event, results):
+    test_node = nodes[config["test_node"]]
+    echo_node = nodes[config["echo_node"]]
+
+    for meting in range(1, AANTAL_METINGEN + 1):
+        if stop_event.is_set():
+            break
+
+        test_value = meting
+        unix_ms = int(time.time() * 1000)
+
+        # Reset echo naar -1 en wacht op bevestiging van de PLC
+        echo_node.set_value(ua.DataValue(ua.Variant(-1, ua.VariantType.Int16)))
+        for _ in range(20):
+            if echo_node.get_value() == -1:
+                break
+            time.sleep(0.005)
+        else:
+            results.append([meting, unix_ms, test_value, "ResetFail", None, None])
+            continue
+
+        start = time.time()
+        test_node.set_value(ua.DataValue(ua.Variant(test_value, ua.VariantType.Int16)))
+
+        for _ in range(MAX_POGINGEN):
+            echoed = echo_node.get_value()
+            if echoed == test_value:
+                round_trip = time.time() - start
+                results.append([meting, unix_ms, test_value, echoed, echoed - test_value, round_trip])
+                break
+            time.sleep(SLEEP_TUSSEN_POLL)
+        else:
+            print(f"[{label}] [{meting:03}] Timeout! Laatste echo = {echoed}")
+            results.append([meting, unix_ms, test_value, echoed, None, None])
+
+        time.sleep(SLEEP_TUSSEN_METINGEN)
+
+
+# === Stress workload (zelfde array-schrijvers als plc_attack.py) ===
+def stress_workload(label, nodes, config, stop_event, results):
+    results_lock = threading.Lock()
+    einde = time.time() + STRESS_DUUR
+
+    def stress_writer():
+        while not stop_event.is_set() and time.time() < einde:
+            for pad in ARRAY_PADEN:
+                value = random.randint(0, 32767)
+                start = time.time()
+                try:
+                    nodes[pad].set_value(ua.DataValue(ua.Variant(value, ua.VariantType.Int16)))
+                    row = [int(start * 1000), pad, "Write", value, time.time() - start, "Success"]
+                except Exception:
+                    row = [int(start * 1000), pad, "Write", value, 0, "Failed"]
+                with results_lock:
+                    results.append(row)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=stress_writer, daemon=True) for _ in range(STRESS_SCHRIJVERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    results.sort(key=lambda r: r[0])
+
+
+def echo_paden(config):
+    return [config["test_node"], config["echo_node"]]
+
+
+def stress_paden(config):
+    return ARRAY_PADEN
+
+
+# Workload -> (functie, CSV-headers, paden); de functie vult `results` tijdens het meten aan
+WORKLOADS = {
+    "echo": (echo_workload, ECHO_HEADERS, echo_paden),
+    "stress": (stress_workload, STRESS_HEADERS, stress_paden),
+}
+
+
+# === Proces per PLC ===
+def run_endpoint(label, config, barrier, start_event, start_tijd, stop_event):
+    # Ctrl+C wordt door het hoofdproces afgehandeld via stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    file_path = os.path.join(OUTPUT_DIR, bestandsnaam(label))
+    if os.path.exists(file_path):
+        os.remove(file_path)  # geen oude resultaten meenemen bij het samenvoegen
+
+    client = Client(config["url"])
+    workload, headers, paden = WORKLOADS[WORKLOAD]
+    results = []
+    gestart = False
+    try:
+        client.connect()
+        print(f"[{label}] [✓] Verbonden met {config['url']}")
+        # Nodes opzoeken vóór de gezamenlijke start, zodat die round trips niet in de meting vallen
+        nodes = resolve_nodes(client, paden(config), namespace_uri=config.get("namespace_uri"))
+        wacht_op_start(label, barrier, start_event, start_tijd, stop_event)
+        gestart = True
+        # Bij een fout halverwege blijven de rijen tot dat moment in `results` bewaard
+        workload(label, nodes, config, stop_event, results)
+    except threading.BrokenBarrierError:
+        print(f"[{label}] [✗] Gezamenlijke start mislukt, niet alle PLC's verbonden")
+    except Exception as e:
+        print(f"[{label}] [✗] Fout opgetreden: {e}")
+        barrier.abort()
+    finally:
+        try:
+            client.disconnect()
+        except Exception:
+            pass
+
+    if gestart:
+        with open(file_path, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(headers)
+            writer.writerows(results)
+        print(f"[{label}] [✓] {len(results)} regels opgeslagen in '{file_path}'")
+
+
+# === Resultaten samenvoegen op gezamenlijke tijdas ===
+def combineer_resultaten(start_unix_ms):
+    rijen = []
+    for label in ENDPOINTS:
+        file_path = os.path.join(OUTPUT_DIR, bestandsnaam(label))
+        if not os.path.exists(file_path):
+            print(f"[⏭️] Geen resultaten voor {label}")
+            continue
+        with open(file_path, newline='') as file:
+            for row in csv.DictReader(file):
+                t_rel = (float(row["tijd_unix_ms"]) - start_unix_ms) / 1000
+                rijen.append({"plc": label, "t_rel_s": round(t_rel, 4), **row})
+
+    if not rijen:
+        return []
+
+    rijen.sort(key=lambda r: float(r["tijd_unix_ms"]))
+    file_path = os.path.join(OUTPUT_DIR, GECOMBINEERD_CSV)
+    with open(file_path, mode='w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rijen[0].keys()))
+        writer.writeheader()
+        writer.writerows(rijen)
+    print(f"[✓] Gecombineerde resultaten opgeslagen in '{file_path}'")
+    return rijen
+
+
+def print_samenvatting(rijen):
+    kolom = "round_trip_seconden" if WORKLOAD == "echo" else "Response Time (s)"
+    print("\n## Gelijktijdige meting per PLC (ms)\n")
+    print("| PLC Type | Metingen | Gemiddelde | Std Dev | Minimum | Maximum |")
+    print("|----------|----------|------------|----------|----------|----------|")
+    for label in ENDPOINTS:
+        waarden = []
+        for r in rijen:
+            if r["plc"] == label and r[kolom] not in ("", None) and r.get("Status", "Success") == "Success":
+                waarden.append(float(r[kolom]) * 1000)
+        if not waarden:
+            continue
+        std = statistics.stdev(waarden) if len(waarden) > 1 else 0.0
+        print(f"| {label} | {len(waarden)} | {statistics.mean(waarden):.2f} | {std:.2f} | {min(waarden):.2f} | {max(waarden):.2f} |")
+
+
+# === Main ===
+if __name__ == "__main__":
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    print(f"Start multi-PLC test ({WORKLOAD}) op {len(ENDPOINTS)} PLC's")
+
+    # Barrier met één extra partij: het hoofdproces legt pas het starttijdstip vast
+    # als alle PLC-processen verbonden zijn.
+    barrier = mp.Barrier(len(ENDPOINTS) + 1)
+    start_event = mp.Event()
+    start_tijd = mp.Value('d', 0.0)
+    stop_event = mp.Event()
+
+    processen = []
+    for label, config in ENDPOINTS.items():
+        p = mp.Process(target=run_endpoint, args=(label, config, barrier, start_event, start_tijd, stop_event), daemon=True)
+        p.start()
+        processen.append(p)
+
+    try:
+        try:
+            barrier.wait(timeout=CONNECT_TIMEOUT)
+            # Iedereen verbonden: starttijdstip vastleggen en pas daarna vrijgeven
+            start_tijd.value = time.time() + START_VERTRAGING
+            start_event.set()
+        except threading.BrokenBarrierError:
+            print("[✗] Niet alle PLC's op tijd verbonden, test afgebroken.")
+
+        for p in processen:
+            p.join()
+
+    except KeyboardInterrupt:
+        print("\n[⛔] Ctrl+C ontvangen – stop alle PLC-processen...")
+        stop_event.set()
+        for p in processen:
+            p.join(timeout=5.0)
+
+    # Zonder gezamenlijke start is er geen gemeenschappelijke tijdas om op samen te voegen
+    if start_event.is_set():
+        rijen = combineer_resultaten(start_tijd.value * 1000)
+        if rijen:
+            print_samenvatting(rijen)
+    print("[🧹] Alles afgesloten.")
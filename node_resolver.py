@@ -0,0 +1,183 @@
+import os
+import json
+import hashlib
+import threading
+from opcua import ua
+
+# === Nodes opzoeken via symbolisch browse-pad i.p.v. vaste numerieke NodeIds ===
+# De numerieke NodeIds van de server-interface (ns=4;i=...) veranderen bij elke
+# hercompilatie in TIA. Paden als "DB.TestInt1" worden daarom in één
+# TranslateBrowsePathsToNodeIds-request opgezocht en per endpoint op schijf
+# gecachet, met namespace-array en BuildInfo van de server als sleutel. Bij een
+# cache-hit worden de BrowseNames van de gecachete nodes in dezelfde Read-request
+# gecontroleerd, zodat een hercompilatie altijd tot opnieuw opzoeken leidt.
+# De namespace van de server-interface (elementen zonder 'ns:'-prefix) wordt op
+# de server zelf opgezocht, via de BrowseName van "Server interface_1" onder
+# "3:ServerInterfaces"; een namespace-URI meegeven is alleen een override.
+BROWSE_ROOT = ["3:ServerInterfaces", "Server interface_1"]  # vanaf de Objects-map
+CACHE_BESTAND = "node_cache.json"
+
+_cache_lock = threading.Lock()
+
+
+def is_nodeid(pad):
+    """Strings als 'ns=4;i=15' of 'ns=3;s="DB"."Var"' worden ongewijzigd als NodeId gebruikt."""
+    return pad.startswith(("ns=", "i=", "s=", "g=", "b="))
+
+
+def _prefix(naam):
+    """'3:ServerInterfaces' -> (3, 'ServerInterfaces'); zonder prefix (None, naam)."""
+    index, _, rest = naam.partition(":")
+    if rest and index.isdigit():
+        return int(index), rest
+    return None, naam
+
+
+def _elementen(pad, ns_index, root):
+    """'DB.TestInt1' -> QualifiedNames; een element mag zelf een 'ns:'-prefix hebben."""
+    elementen = []
+    for naam in list(root) + pad.split("."):
+        index, naam = _prefix(naam)
+        elementen.append(ua.QualifiedName(naam, ns_index if index is None else index))
+    return elementen
+
+
+def _browsepath(elementen):
+    bp = ua.BrowsePath()
+    bp.StartingNode = ua.NodeId(ua.ObjectIds.ObjectsFolder)
+    for naam in elementen:
+        el = ua.RelativePathElement()
+        el.ReferenceTypeId = ua.NodeId(ua.ObjectIds.HierarchicalReferences)
+        el.IsInverse = False
+        el.IncludeSubtypes = True
+        el.TargetName = naam
+        bp.RelativePath.Elements.append(el)
+    return bp
+
+
+def _lees(client, nodes):
+    """Eén Read-request voor een lijst (NodeId, AttributeId)-paren."""
+    params = ua.ReadParameters()
+    for nodeid, attribuut in nodes:
+        rv = ua.ReadValueId()
+        rv.NodeId = nodeid
+        rv.AttributeId = attribuut
+        params.NodesToRead.append(rv)
+    return client.uaclient.read(params)
+
+
+def _sleutel(namespaces, buildinfo, root, namespace_uri):
+    if buildinfo is not None:
+        buildinfo = [buildinfo.ProductUri, buildinfo.ManufacturerName, buildinfo.SoftwareVersion,
+                     buildinfo.BuildNumber, str(buildinfo.BuildDate)]
+    inhoud = json.dumps([namespaces, buildinfo, list(root), namespace_uri])
+    return hashlib.sha1(inhoud.encode()).hexdigest()
+
+
+def _laad_cache(cache_bestand):
+    if not cache_bestand or not os.path.exists(cache_bestand):
+        return {}
+    try:
+        with open(cache_bestand) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _schrijf_cache(cache_bestand, endpoint, sleutel, ns_index, nodes):
+    if not cache_bestand:
+        return
+    cache = _laad_cache(cache_bestand)   # opnieuw laden: andere processen kunnen ook schrijven
+    cache[endpoint] = {"sleutel": sleutel, "ns_index": ns_index, "nodes": nodes}
+    tijdelijk = f"{cache_bestand}.{os.getpid()}.tmp"
+    with open(tijdelijk, "w") as file:
+        json.dump(cache, file, indent=2, sort_keys=True)
+    os.replace(tijdelijk, cache_bestand)
+
+
+def _vertaal(client, paden, ns_index, root):
+    browsepaths = [_browsepath(_elementen(pad, ns_index, root)) for pad in paden]
+
+    gevonden = {}
+    for pad, result in zip(paden, client.uaclient.translate_browsepaths_to_nodeids(browsepaths)):
+        if not result.StatusCode.is_good() or not result.Targets:
+            raise ua.UaError(f"Browse-pad niet gevonden: {pad} ({result.StatusCode.name})")
+        gevonden[pad] = result.Targets[0].TargetId.to_string()
+    return gevonden
+
+
+def _namespace_index(client, namespaces, namespace_uri, namen):
+    """
+    Namespace-index voor elementen zonder 'ns:'-prefix. Met `namespace_uri` uit de
+    NamespaceArray, anders van de server: de BrowseName van het eerste element
+    zonder prefix (bijv. "Server interface_1") onder zijn ouder met prefix.
+    """
+    if namespace_uri is not None:
+        if namespace_uri not in namespaces:
+            raise ua.UaError(f"Namespace-URI '{namespace_uri}' niet gevonden; namespaces van de server: {namespaces}")
+        return namespaces.index(namespace_uri)
+
+    ouder = []
+    for naam in namen:
+        index, naam = _prefix(naam)
+        if index is not None:
+            ouder.append(ua.QualifiedName(naam, index))
+            continue
+        ouder_id = ua.NodeId(ua.ObjectIds.ObjectsFolder)
+        if ouder:
+            result, = client.uaclient.translate_browsepaths_to_nodeids([_browsepath(ouder)])
+            if not result.StatusCode.is_good() or not result.Targets:
+                raise ua.UaError(f"Browse-pad niet gevonden: {'.'.join(namen[:len(ouder)])} ({result.StatusCode.name})")
+            ouder_id = result.Targets[0].TargetId
+        for ref in client.get_node(ouder_id).get_children_descriptions():
+            if ref.BrowseName.Name == naam:
+                return ref.BrowseName.NamespaceIndex
+        raise ua.UaError(f"Browse-pad niet gevonden: '{naam}' ontbreekt onder {'.'.join(namen[:len(ouder)]) or 'Objects'}")
+    return None   # alle elementen hebben een prefix
+
+
+def resolve_nodes(client, paden, root=BROWSE_ROOT, namespace_uri=None, cache_bestand=CACHE_BESTAND):
+    """
+    Geeft een dict pad -> Node voor alle `paden`. NodeId-strings worden direct
+    doorgegeven; symbolische paden komen uit de cache of worden in één request opgezocht.
+    `namespace_uri` is een optionele override voor de namespace van de server-interface.
+    """
+    symbolisch = sorted({pad for pad in paden if not is_nodeid(pad)})
+    endpoint = client.server_url.geturl()
+
+    with _cache_lock:
+        entry = _laad_cache(cache_bestand).get(endpoint, {})
+        opgeslagen = entry.get("nodes", {})
+        gecontroleerd = [pad for pad in symbolisch if pad in opgeslagen]
+
+        # Cache-sleutel en controle van de gecachete nodes in één Read-request
+        te_lezen = [(ua.NodeId(ua.ObjectIds.Server_NamespaceArray), ua.AttributeIds.Value),
+                    (ua.NodeId(ua.ObjectIds.Server_ServerStatus_BuildInfo), ua.AttributeIds.Value)]
+        te_lezen += [(ua.NodeId.from_string(opgeslagen[pad]), ua.AttributeIds.BrowseName) for pad in gecontroleerd]
+        waarden = _lees(client, te_lezen)
+
+        namespaces = waarden[0].Value.Value
+        buildinfo = waarden[1].Value.Value if waarden[1].StatusCode.is_good() else None
+        sleutel = _sleutel(namespaces, buildinfo, root, namespace_uri)
+        cache_geldig = entry.get("sleutel") == sleutel
+        ns_index = entry.get("ns_index") if cache_geldig else None
+
+        geldig = {}
+        if cache_geldig:
+            for pad, dv in zip(gecontroleerd, waarden[2:]):
+                verwacht = _elementen(pad, ns_index, root)[-1]
+                naam = dv.Value.Value if dv.StatusCode.is_good() else None
+                if naam is not None and (naam.Name, naam.NamespaceIndex) == (verwacht.Name, verwacht.NamespaceIndex):
+                    geldig[pad] = opgeslagen[pad]
+
+        ontbrekend = [pad for pad in symbolisch if pad not in geldig]
+        if ontbrekend:
+            if len(geldig) < len(gecontroleerd) or not cache_geldig:
+                # Server of programma gewijzigd (bijv. hercompilatie): oude cache vervalt
+                opgeslagen, geldig, ontbrekend = {}, {}, symbolisch
+                ns_index = _namespace_index(client, namespaces, namespace_uri, list(root) + symbolisch[0].split("."))
+            geldig.update(_vertaal(client, ontbrekend, ns_index, root))
+            _schrijf_cache(cache_bestand, endpoint, sleutel, ns_index, {**opgeslagen, **geldig})
+            print(f"[✓] {len(ontbrekend)} node(s) opgezocht via browse-pad")
+
+    return {pad: client.get_node(geldig.get(pad, pad)) for pad in paden}
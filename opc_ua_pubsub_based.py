@@ -1,17 +1,29 @@
 from opcua import Client, ua
 import time
 import csv
-import matplotlib.pyplot as plt
 import threading
+from node_resolver import resolve_nodes
+from live_metrics import LiveMetrics
+from cycletime_capture import CycleTimeMonitor, CSV_KOLOMMEN as CYCLETIME_KOLOMMEN
 
 # === OPC UA instellingen ===
 OPC_SERVER = "opc.tcp://172.16.0.1:4840"
-TEST_NODE_ID = 'ns=4;i=2'     # schrijf node: TestInt1
-ECHO_NODE_ID = 'ns=4;i=3'     # echo node: EchoInt1
+TEST_NODE_PAD = "DB.TestInt1"   # schrijf node (browse-pad, zie node_resolver.py)
+ECHO_NODE_PAD = "DB.EchoInt1"   # echo node
 
 # === Testinstellingen ===
 AANTAL_METINGEN = 250
 CSV_BESTAND = "opcua_sync_latency_log.csv"
+CYCLETIME_MODUS = None       # None of "subscription" (deze test doet geen Reads)
+
+# === Live metrics i.p.v. plot achteraf (zie live_metrics.py) ===
+METRICS_POORT = 18102      # http://127.0.0.1:18102/metrics, None = uit
+METRICS_BESTAND = None     # bijv. "opcua_metrics.jsonl"
+TOON_PLOT = False          # matplotlib-plot na afloop
+
+# Deze test doet geen Reads, dus kan de cycletime niet meeliften
+if CYCLETIME_MODUS == "read":
+    raise SystemExit('[✗] CYCLETIME_MODUS "read" werkt niet zonder Reads; gebruik "subscription".')
 
 # === Globale variabelen ===
 echo_lock = threading.Condition()
@@ -39,8 +51,9 @@ client = Client(OPC_SERVER)
 client.connect()
 print(f"[✓] Verbonden met {OPC_SERVER}")
 
-test_node = client.get_node(TEST_NODE_ID)
-echo_node = client.get_node(ECHO_NODE_ID)
+nodes = resolve_nodes(client, [TEST_NODE_PAD, ECHO_NODE_PAD])
+test_node = nodes[TEST_NODE_PAD]
+echo_node = nodes[ECHO_NODE_PAD]
 
 handler = EchoHandler()
 sub = client.create_subscription(50, handler)
@@ -48,6 +61,12 @@ sub_handle = sub.subscribe_data_change(echo_node)
 
 print("[✓] Subscription actief")
 
+cycletime = CycleTimeMonitor(client, CYCLETIME_MODUS).start()
+metrics = LiveMetrics(METRICS_POORT, METRICS_BESTAND).start()
+def bewaar(rij):
+    metrics.registreer("echo", "subscription", rij[5] or 0, ok=rij[5] is not None)
+    results.append(rij + cycletime.laatste() if cycletime.actief else rij)
+
 # === Testloop met synchronisatie op echo ===
 for meting in range(1, AANTAL_METINGEN + 1):
     test_value = meting
@@ -65,10 +84,10 @@ for meting in range(1, AANTAL_METINGEN + 1):
     if success and latest_echo and latest_echo[0] == test_value:
         latency = latest_echo[1]
         print(f"[{meting:03}] Echo = {test_value} (✓) na {latency:.4f} s")
-        results.append([meting, unix_ms, test_value, test_value, 0, latency])
+        bewaar([meting, unix_ms, test_value, test_value, 0, latency])
     else:
         print(f"[{meting:03}] Timeout! Geen bevestiging van {test_value}")
-        results.append([meting, unix_ms, test_value, latest_echo[0] if latest_echo else None, None, None])
+        bewaar([meting, unix_ms, test_value, latest_echo[0] if latest_echo else None, None, None])
 
     # Reset voor volgende meting
     latest_echo = None
@@ -76,6 +95,8 @@ for meting in range(1, AANTAL_METINGEN + 1):
     current_start_time = None
 
 # === Opruimen ===
+cycletime.stop()
+metrics.stop()
 sub.unsubscribe(sub_handle)
 sub.delete()
 client.disconnect()
@@ -84,17 +105,20 @@ print("[→] Verbinding gesloten")
 # === Resultaten opslaan ===
 with open(CSV_BESTAND, mode='w', newline='') as file:
     writer = csv.writer(file)
-    writer.writerow(["meting_nummer", "tijd_unix_ms", "testwaarde", "echo_waarde", "verschil", "round_trip_seconden"])
+    headers = ["meting_nummer", "tijd_unix_ms", "testwaarde", "echo_waarde", "verschil", "round_trip_seconden"]
+    writer.writerow(headers + CYCLETIME_KOLOMMEN if cycletime.actief else headers)
     writer.writerows(results)
 
 print(f"[✓] Resultaten opgeslagen in '{CSV_BESTAND}'")
 
 # === Plot ===
-latency_values = [r[5] for r in results if r[5] is not None]
-plt.plot(latency_values, marker='o')
-plt.title("OPC UA Round-trip tijd per meting (Subscription, echo == input)")
-plt.xlabel("Meting nummer")
-plt.ylabel("Round-trip tijd (s)")
-plt.grid(True)
-plt.tight_layout()
-plt.show()
+if TOON_PLOT:
+    import matplotlib.pyplot as plt
+    latency_values = [r[5] for r in results if r[5] is not None]
+    plt.plot(latency_values, marker='o')
+    plt.title("OPC UA Round-trip tijd per meting (Subscription, echo == input)")
+    plt.xlabel("Meting nummer")
+    plt.ylabel("Round-trip tijd (s)")
+    plt.grid(True)
+    plt.tight_layout()
+    plt.show()
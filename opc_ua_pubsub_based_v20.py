@@ -3,54 +3,73 @@ import csv
 import time
 import threading
 from opcua import Client, ua
+from node_resolver import resolve_nodes
+from live_metrics import LiveMetrics
+from cycletime_capture import CycleTimeMonitor, CSV_KOLOMMEN as CYCLETIME_KOLOMMEN
 
 # === OPC UA instellingen ===
 OPC_SERVER = "opc.tcp://172.16.0.1:4840"
 
-# Node mapping per client (TestInt, EchoInt)
-CLIENT_NODE_IDS = {
-    1: ("ns=4;i=15",   "ns=4;i=1637"),
-    2: ("ns=4;i=16",   "ns=4;i=1661"),
-    3: ("ns=4;i=17",   "ns=4;i=1662"),
-    4: ("ns=4;i=1650", "ns=4;i=1663"),
-    5: ("ns=4;i=1649", "ns=4;i=1664"),
-}
-
 # === Testinstellingen ===
 AANTAL_METINGEN = 250
-OUTPUT_DIR = "multi_client_results"
+AANTAL_CLIENTS = 5
+CYCLETIME_MODUS = None       # None of "subscription" (deze test doet geen Reads)
+
+# "sessie_per_client": elke client een eigen sessie + subscription (oorspronkelijke test)
+# "gemultiplexed": alle clients in één sessie, één subscription en één Write-request per ronde
+MODUS = "sessie_per_client"
+OUTPUT_DIR = "multi_client_results" if MODUS == "sessie_per_client" else "multi_client_results_gemultiplexed"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Deze test doet geen Reads, dus kan de cycletime niet meeliften
+if CYCLETIME_MODUS == "read":
+    raise SystemExit('[✗] CYCLETIME_MODUS "read" werkt niet zonder Reads; gebruik "subscription".')
+
+# === Live metrics per client (zie live_metrics.py) ===
+METRICS_POORT = 18103      # http://127.0.0.1:18103/metrics, None = uit
+METRICS_BESTAND = None     # bijv. "opcua_metrics.jsonl"
+metrics = LiveMetrics(METRICS_POORT, METRICS_BESTAND)
+
+# Node mapping per client (TestInt, EchoInt) als browse-pad (zie node_resolver.py)
+CLIENT_NODE_IDS = {
+    client_id: (f"DB.TestInt{client_id}", f"DB.EchoInt{client_id}")
+    for client_id in range(1, AANTAL_CLIENTS + 1)
+}
+
 stop_event = threading.Event()
+gedeelde_cycletime = None  # één cycletime-subscription voor alle client-sessies
 
 def run_client(client_id):
     print(f"[Client {client_id}] Start")
 
     results = []
     echo_lock = threading.Lock()
+    echo_ontvangen = threading.Event()
     latest_echo = {"value": None, "latency": None}
     current_test_value = None
     current_start_time = None
 
     class EchoHandler:
         def datachange_notification(self, node, val, data):
-            nonlocal latest_echo, current_test_value, current_start_time
-            if current_test_value is not None and val == current_test_value:
-                latency = time.time() - current_start_time
-                with echo_lock:
-                    latest_echo["value"] = val
-                    latest_echo["latency"] = latency
+            with echo_lock:
+                if current_test_value is None or val != current_test_value or echo_ontvangen.is_set():
+                    return
+                latest_echo["value"] = val
+                latest_echo["latency"] = time.time() - current_start_time
+                echo_ontvangen.set()
 
     client = None
     sub = None
+    cycletime = gedeelde_cycletime
 
     try:
         test_node_id, echo_node_id = CLIENT_NODE_IDS[client_id]
         client = Client(OPC_SERVER)
         client.session_timeout = 60000
         client.connect()
-        test_node = client.get_node(test_node_id)
-        echo_node = client.get_node(echo_node_id)
+        nodes = resolve_nodes(client, [test_node_id, echo_node_id])
+        test_node = nodes[test_node_id]
+        echo_node = nodes[echo_node_id]
 
         handler = EchoHandler()
         sub = client.create_subscription(50, handler)
@@ -62,11 +81,12 @@ def run_client(client_id):
                 break
 
             test_value = meting
-            current_test_value = test_value
-            current_start_time = time.time()
-            unix_ms = int(current_start_time * 1000)
             with echo_lock:
                 latest_echo["value"] = None
+                echo_ontvangen.clear()
+                current_test_value = test_value
+                current_start_time = time.time()
+            unix_ms = int(current_start_time * 1000)
 
             try:
                 test_node.set_value(ua.DataValue(ua.Variant(test_value, ua.VariantType.Int16)))
@@ -74,23 +94,25 @@ def run_client(client_id):
                 print(f"[Client {client_id}] ⚠️ Fout bij write: {e}")
                 continue
 
-            timeout = 5
-            start = time.time()
-            while not stop_event.is_set() and time.time() - start < timeout:
-                with echo_lock:
-                    if latest_echo["value"] == test_value:
-                        latency = latest_echo["latency"]
-                        print(f"[Client {client_id}] Echo {test_value} ✓ {latency:.4f}s")
-                        results.append([meting, unix_ms, test_value, latency])
-                        break
-                time.sleep(0.1)
+            # Wachten op de notificatie i.p.v. pollen, zelfde pacing als de gemultiplexte modus
+            echo_ontvangen.wait(timeout=5)
+            with echo_lock:
+                latency = latest_echo["latency"] if latest_echo["value"] == test_value else None
+                current_test_value = None
+                current_start_time = None
+
+            if latency is not None:
+                print(f"[Client {client_id}] Echo {test_value} ✓ {latency:.4f}s")
+                metrics.registreer(f"client_{client_id}", MODUS, latency)
+                rij = [meting, unix_ms, test_value, latency]
+                if cycletime:
+                    # lege "pogingen"-kolom zodat de cycletime onder de juiste header valt
+                    rij += [None] + cycletime.laatste()
+                results.append(rij)
             else:
+                metrics.registreer(f"client_{client_id}", MODUS, 0, ok=False)
                 print(f"[Client {client_id}] ❌ Geen echo voor {test_value} binnen tijd")
 
-
-            current_test_value = None
-            current_start_time = None
-
     except Exception as e:
         print(f"[Client {client_id}] ❌ Fout: {e}")
 
@@ -106,21 +128,135 @@ def run_client(client_id):
             except:
                 pass
 
-        # CSV wegschrijven
-        file_path = os.path.join(OUTPUT_DIR, f"client_{client_id}_result.csv")
-        with open(file_path, 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(["meting_nummer", "tijd_unix_ms", "testwaarde", "round_trip_s", "pogingen"])
-            writer.writerows(results)
+        schrijf_resultaten(client_id, results, cycletime)
+
+def schrijf_resultaten(client_id, results, cycletime):
+    file_path = os.path.join(OUTPUT_DIR, f"client_{client_id}_result.csv")
+    with open(file_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        headers = ["meting_nummer", "tijd_unix_ms", "testwaarde", "round_trip_s", "pogingen"]
+        writer.writerow(headers + CYCLETIME_KOLOMMEN if cycletime and cycletime.actief else headers)
+        writer.writerows(results)
+
+    print(f"[Client {client_id}] ✅ Klaar – log: {file_path}")
+
+def run_gemultiplexed():
+    """Alle logische clients via één sessie: één subscription en één Write per ronde."""
+    print(f"[Multiplex] Start met {len(CLIENT_NODE_IDS)} logische clients")
+
+    results = {client_id: [] for client_id in CLIENT_NODE_IDS}
+    echo_lock = threading.Lock()
+    alle_echos = threading.Event()
+    latencies = {}
+    current_test_value = None
+    current_start_time = None
+
+    class MultiplexHandler:
+        def datachange_notification(self, node, val, data):
+            # Notificatie terugleiden naar de logische client van deze EchoInt
+            client_id = echo_clients.get(node.nodeid)
+            with echo_lock:
+                if client_id is None or current_test_value is None or val != current_test_value:
+                    return
+                if client_id not in latencies:
+                    latencies[client_id] = time.time() - current_start_time
+                    if len(latencies) == len(echo_clients):
+                        alle_echos.set()
+
+    client = None
+    sub = None
+    cycletime = None
+
+    try:
+        client = Client(OPC_SERVER)
+        client.session_timeout = 60000
+        client.connect()
+        nodes = resolve_nodes(client, [pad for paar in CLIENT_NODE_IDS.values() for pad in paar])
+        client_ids = list(CLIENT_NODE_IDS)
+        test_nodes = [nodes[CLIENT_NODE_IDS[client_id][0]] for client_id in client_ids]
+        echo_nodes = [nodes[CLIENT_NODE_IDS[client_id][1]] for client_id in client_ids]
+        echo_clients = {node.nodeid: client_id for client_id, node in zip(client_ids, echo_nodes)}
+
+        sub = client.create_subscription(50, MultiplexHandler())
+        sub.subscribe_data_change(echo_nodes)
+        cycletime = CycleTimeMonitor(client, CYCLETIME_MODUS).start()
+
+        for meting in range(1, AANTAL_METINGEN + 1):
+            if stop_event.is_set():
+                print("[Multiplex] ❌ Stop-signaal ontvangen, breekt af.")
+                break
+
+            test_value = meting
+            with echo_lock:
+                latencies.clear()
+                alle_echos.clear()
+                current_test_value = test_value
+                current_start_time = time.time()
+            unix_ms = int(current_start_time * 1000)
+
+            try:
+                waarde = ua.DataValue(ua.Variant(test_value, ua.VariantType.Int16))
+                client.set_values(test_nodes, [waarde] * len(test_nodes))
+            except Exception as e:
+                print(f"[Multiplex] ⚠️ Fout bij write: {e}")
+                continue
+
+            alle_echos.wait(timeout=5)
+            with echo_lock:
+                ontvangen = dict(latencies)
+                current_test_value = None
+
+            extra = [None] + cycletime.laatste() if cycletime.actief else []
+            for client_id in client_ids:
+                if client_id in ontvangen:
+                    metrics.registreer(f"client_{client_id}", MODUS, ontvangen[client_id])
+                    results[client_id].append([meting, unix_ms, test_value, ontvangen[client_id]] + extra)
+                else:
+                    metrics.registreer(f"client_{client_id}", MODUS, 0, ok=False)
+                    print(f"[Client {client_id}] ❌ Geen echo voor {test_value} binnen tijd")
+            print(f"[Multiplex] Echo {test_value}: {len(ontvangen)}/{len(client_ids)} ✓ "
+                  f"max {max(ontvangen.values(), default=0):.4f}s")
+
+    except Exception as e:
+        print(f"[Multiplex] ❌ Fout: {e}")
 
-        print(f"[Client {client_id}] ✅ Klaar – log: {file_path}")
+    finally:
+        if cycletime:
+            cycletime.stop()
+        if sub:
+            try:
+                sub.delete()
+            except:
+                pass
+        if client:
+            try:
+                client.disconnect()
+            except:
+                pass
+
+        for client_id, client_results in results.items():
+            schrijf_resultaten(client_id, client_results, cycletime)
 
 # === Start alle clients parallel
 threads = []
 
+metrics.start()
+cycletime_client = None
+
 try:
-    for client_id in CLIENT_NODE_IDS:
-        t = threading.Thread(target=run_client, args=(client_id,))
+    if CYCLETIME_MODUS and MODUS == "sessie_per_client":
+        # Eén extra sessie met één snelle subscription, i.p.v. een subscription per client-sessie
+        cycletime_client = Client(OPC_SERVER)
+        cycletime_client.connect()
+        gedeelde_cycletime = CycleTimeMonitor(cycletime_client, CYCLETIME_MODUS).start()
+
+    if MODUS == "gemultiplexed":
+        taken = [(run_gemultiplexed, ())]
+    else:
+        taken = [(run_client, (client_id,)) for client_id in CLIENT_NODE_IDS]
+
+    for target, args in taken:
+        t = threading.Thread(target=target, args=args)
         t.daemon = True
         t.start()
         threads.append(t)
@@ -134,4 +270,12 @@ except KeyboardInterrupt:
     for t in threads:
         t.join(timeout=2.0)
 
+if gedeelde_cycletime:
+    gedeelde_cycletime.stop()
+if cycletime_client:
+    try:
+        cycletime_client.disconnect()
+    except:
+        pass
+metrics.stop()
 print("[🧹] Alles afgesloten.")
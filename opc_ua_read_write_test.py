@@ -1,22 +1,40 @@
 from opcua import Client, ua
 import time
 import csv
-import matplotlib.pyplot as plt
+from node_resolver import resolve_nodes
+from live_metrics import LiveMetrics
+from cycletime_capture import CycleTimeMonitor, CSV_KOLOMMEN as CYCLETIME_KOLOMMEN
 
 # === OPC UA instellingen ===
 OPC_SERVER = "opc.tcp://172.16.0.1:4840"
-TEST_NODE_ID = 'ns=4; i=15'     #i=2'    # TestInt1
-ECHO_NODE_ID = 'ns=4; i=1637'   #i=3'    # EchoInt1
+# Symbolische browse-paden (zie node_resolver.py); een NodeId-string zoals 'ns=4;i=15' mag ook
+TEST_NODE_PAD = "DB.TestInt1"
+ECHO_NODE_PAD = "DB.EchoInt1"
+
+# Methode die de invoer (Int16) direct teruggeeft, bijv. een OPC_UA_ServerMethodPre/Post-instantie
+METHOD_OBJECT_NODE_ID = 'ns=3;s="EchoMethod_DB"'
+METHOD_NODE_ID = 'ns=3;s="EchoMethod_DB".Method'
 
 # === Testinstellingen ===
 AANTAL_METINGEN = 150
 SLEEP_TUSSEN_METINGEN = 0.05 #seconden
 MAX_POGINGEN = 10
 SLEEP_TUSSEN_POLL = 0.001    # 1 ms tussen polling
+CYCLETIME_MODUS = None       # None, "subscription" of "read" (zie cycletime_capture.py)
+ECHO_MODUS = "write_poll"    # "write_poll" (TestInt → PLC-cyclus → EchoInt) of "method" (Call-request)
 
 # === CSV-bestand ===
 CSV_BESTAND = "opcua_latency_log.csv"
 
+# === Live metrics i.p.v. plot achteraf (zie live_metrics.py) ===
+METRICS_POORT = 18101      # http://127.0.0.1:18101/metrics, None = uit
+METRICS_BESTAND = None     # bijv. "opcua_metrics.jsonl"
+TOON_PLOT = False          # matplotlib-plot na afloop
+
+# In "method"-modus wordt er geen Read gedaan, dus kan de cycletime niet meeliften
+if ECHO_MODUS == "method" and CYCLETIME_MODUS == "read":
+    raise SystemExit('[✗] CYCLETIME_MODUS "read" werkt niet met ECHO_MODUS "method"; gebruik "subscription".')
+
 # === Verbinden ===
 client = Client(OPC_SERVER)
 
@@ -24,10 +42,20 @@ try:
     client.connect()
     print(f"[✓] Verbonden met {OPC_SERVER}")
 
-    test_node = client.get_node(TEST_NODE_ID)
-    echo_node = client.get_node(ECHO_NODE_ID)
+    nodes = resolve_nodes(client, [TEST_NODE_PAD, ECHO_NODE_PAD])
+    test_node = nodes[TEST_NODE_PAD]
+    echo_node = nodes[ECHO_NODE_PAD]
+    if ECHO_MODUS == "method":
+        method_object = client.get_node(METHOD_OBJECT_NODE_ID)
+        method_node = client.get_node(METHOD_NODE_ID)
     print(f"[✓] Nodes opgehaald")
 
+    cycletime = CycleTimeMonitor(client, CYCLETIME_MODUS).start()
+    metrics = LiveMetrics(METRICS_POORT, METRICS_BESTAND).start()
+    def bewaar(rij):
+        metrics.registreer("echo", ECHO_MODUS, rij[5] or 0, ok=rij[5] is not None)
+        results.append(rij + cycletime.laatste() if cycletime.actief else rij)
+
     results = []
 
     for meting in range(1, AANTAL_METINGEN + 1):
@@ -35,6 +63,27 @@ try:
         expected_echo = test_value
         unix_ms = int(time.time() * 1000)
 
+        if ECHO_MODUS == "method":
+            # Eén Call-request: meet alleen het request/response-pad van de server,
+            # zonder de TestInt → EchoInt kopie via de PLC-cyclus
+            start = time.time()
+            try:
+                echoed = method_object.call_method(method_node, ua.Variant(test_value, ua.VariantType.Int16))
+            except ua.UaStatusCodeError as e:
+                print(f"[{meting:03}] Methode-aanroep mislukt: {e}")
+                echoed = None
+            round_trip = time.time() - start
+
+            if echoed == expected_echo:
+                print(f"[{meting:03}] Echo = {echoed} (✓) via methode: {round_trip:.4f} s")
+                bewaar([meting, unix_ms, test_value, echoed, echoed - test_value, round_trip])
+            else:
+                print(f"[{meting:03}] Foute echo! Ontvangen {echoed}, verwacht {expected_echo}")
+                bewaar([meting, unix_ms, test_value, echoed, None, None])
+
+            time.sleep(SLEEP_TUSSEN_METINGEN)
+            continue
+
         # Reset echo naar -1
         echo_node.set_value(ua.DataValue(ua.Variant(-1, ua.VariantType.Int16)))
 
@@ -45,7 +94,7 @@ try:
             time.sleep(0.005)
         else:
             print(f"[{meting:03}] ⚠️ Reset niet bevestigd (echo ≠ -1), skipping")
-            results.append([meting, unix_ms, test_value, "ResetFail", None, None])
+            bewaar([meting, unix_ms, test_value, "ResetFail", None, None])
             continue  # sla deze meting over
 
         # Schrijf testwaarde
@@ -54,39 +103,49 @@ try:
 
         # Wachten op juiste echo van PLC
         for i in range(MAX_POGINGEN):
-            echoed = echo_node.get_value()
+            if CYCLETIME_MODUS == "read":
+                # De cycletime gaat mee in dezelfde Read-request
+                echoed, = cycletime.lees([echo_node])
+            else:
+                echoed = echo_node.get_value()
             if echoed == expected_echo:
                 end = time.time()
                 round_trip = end - start
                 print(f"[{meting:03}] Echo = {echoed} (✓) in {i+1}x: {round_trip:.4f} s")
-                results.append([meting, unix_ms, test_value, echoed, echoed - test_value, round_trip])
+                bewaar([meting, unix_ms, test_value, echoed, echoed - test_value, round_trip])
                 time.sleep(SLEEP_TUSSEN_METINGEN)
                 break
             time.sleep(SLEEP_TUSSEN_POLL)
         else:
             print(f"[{meting:03}] Timeout! Laatste echo = {echoed}, verwacht {expected_echo}")
-            results.append([meting, unix_ms, test_value, echoed, None, None])
+            bewaar([meting, unix_ms, test_value, echoed, None, None])
 
 
         time.sleep(SLEEP_TUSSEN_METINGEN)
 
+    cycletime.stop()
+    metrics.stop()
+
     # Wegschrijven naar CSV
     with open(CSV_BESTAND, mode='w', newline='') as file:
         writer = csv.writer(file)
-        writer.writerow(["meting_nummer", "tijd_unix_ms", "testwaarde", "echo_waarde", "verschil", "round_trip_seconden"])
+        headers = ["meting_nummer", "tijd_unix_ms", "testwaarde", "echo_waarde", "verschil", "round_trip_seconden"]
+        writer.writerow(headers + CYCLETIME_KOLOMMEN if cycletime.actief else headers)
         writer.writerows(results)
 
     print(f"[✓] {AANTAL_METINGEN} metingen opgeslagen in '{CSV_BESTAND}'")
 
     # Plotten
-    latency_values = [r[5] for r in results if r[5] is not None]
-    plt.plot(latency_values, marker='o')
-    plt.title("OPC UA Reactietijd per meting")
-    plt.xlabel("Meting nummer")
-    plt.ylabel("Round-trip tijd (s)")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
+    if TOON_PLOT:
+        import matplotlib.pyplot as plt
+        latency_values = [r[5] for r in results if r[5] is not None]
+        plt.plot(latency_values, marker='o')
+        plt.title("OPC UA Reactietijd per meting")
+        plt.xlabel("Meting nummer")
+        plt.ylabel("Round-trip tijd (s)")
+        plt.grid(True)
+        plt.tight_layout()
+        plt.show()
 
 except Exception as e:
     print(f"[✗] Fout opgetreden: {e}")
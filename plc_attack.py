@@ -5,14 +5,27 @@ import csv
 import os
 import signal
 from opcua import Client, ua
+from cycletime_capture import CycleTimeMonitor
+from node_resolver import resolve_nodes
+from live_metrics import LiveMetrics
 
 # === OPC UA instellingen ===
 OPC_SERVER = "opc.tcp://172.16.0.1:4840"
 client = Client(OPC_SERVER)
 
+# === PLC cycletime (optioneel, zie cycletime_capture.py) ===
+# "read" leest de cycletime mee in de Read-request van de HMI-poll (elke 0,5 s),
+# "subscription" gebruikt een eigen snelle subscription.
+CYCLETIME_MODUS = None  # None, "subscription" of "read"
+cycletime = None
+
 # === CSV-bestand ===
-CSV_FILE = "opcua_results.csv"
+# Het bestand wordt aangevuld; met cycletime-kolommen gaat de log naar een apart
+# bestand zodat er nooit rijen met een afwijkend aantal kolommen onder één header staan.
+CSV_FILE = "opcua_results_cycletime.csv" if CYCLETIME_MODUS else "opcua_results.csv"
 csv_headers = ["Timestamp", "Variable", "Operation", "Value", "Response Time (s)", "Status"]
+if CYCLETIME_MODUS:
+    csv_headers += ["Cycle Time (ns)", "Cycle Time Timestamp (ms)"]
 if not os.path.exists(CSV_FILE):
     with open(CSV_FILE, mode="w", newline="") as file:
         csv.writer(file).writerow(csv_headers)
@@ -20,7 +33,18 @@ if not os.path.exists(CSV_FILE):
 # === Configuratie ===
 stop_event = threading.Event()
 TEST_DURATION = 500  # seconden
-ARRAY_BASE_NODEID_START = 17  # TestArray2[0] = i=17, TestArray2[1] = i=18, ..., TestArray2[99] = i=116
+
+# === Live metrics (zie live_metrics.py) ===
+METRICS_POORT = 18100      # http://127.0.0.1:18100/metrics, None = uit
+METRICS_BESTAND = None     # bijv. "opcua_metrics.jsonl" voor een append-only stream
+PRINT_PER_OPERATIE = False # een print per read/write vertraagt de stress-threads zelf
+metrics = LiveMetrics(METRICS_POORT, METRICS_BESTAND)
+
+# === Nodes (browse-paden, zie node_resolver.py) ===
+TEST_BOOL1_PAD = "DB.TestBool1"
+TEST_BOOL2_PAD = "DB.TestBool2"
+ARRAY_PADEN = [f"DB.TestArray2[{index}]" for index in range(100)]
+nodes = {}  # browse-pad -> Node, gevuld na het verbinden
 
 # === Loggingfunctie ===
 def log_to_csv(variable, operation, value, response_time, status):
@@ -35,7 +59,7 @@ def log_to_csv(variable, operation, value, response_time, status):
             value,
             f"{response_time:.4f}",
             status
-        ])
+        ] + (cycletime.laatste() if cycletime else []))
 
 # === Connectiebeheer ===
 def connect_opc():
@@ -57,31 +81,44 @@ def disconnect_opc():
         print(f"Disconnect fout: {e}")
 
 # === Lezen en schrijven ===
-def read_variable(nodeid):
+def get_node(pad):
+    """Opgezochte node voor een browse-pad; een NodeId-string mag ook direct."""
+    return nodes[pad] if pad in nodes else client.get_node(pad)
+
+def read_variable(pad):
     try:
         start = time.time()
-        value = client.get_node(nodeid).get_value()
+        if CYCLETIME_MODUS == "read":
+            value, = cycletime.lees([get_node(pad)])
+        else:
+            value = get_node(pad).get_value()
         duration = time.time() - start
-        print(f"Read {nodeid}: {value}")
-        log_to_csv(nodeid, "Read", value, duration, "Success")
+        metrics.registreer(threading.current_thread().name, "Read", duration)
+        if PRINT_PER_OPERATIE:
+            print(f"Read {pad}: {value}")
+        log_to_csv(pad, "Read", value, duration, "Success")
         return value
     except Exception as e:
+        metrics.registreer(threading.current_thread().name, "Read", 0, ok=False)
         print(f"Read error: {e}")
-        log_to_csv(nodeid, "Read", "N/A", 0, "Failed")
+        log_to_csv(pad, "Read", "N/A", 0, "Failed")
         return None
 
-def write_variable(nodeid, value, varianttype=ua.VariantType.Int16):
+def write_variable(pad, value, varianttype=ua.VariantType.Int16):
     try:
         start = time.time()
-        node = client.get_node(nodeid)
+        node = get_node(pad)
         val = ua.DataValue(ua.Variant(value, varianttype))
         node.set_value(val)
         duration = time.time() - start
-        print(f"Wrote {value} to {nodeid}")
-        log_to_csv(nodeid, "Write", value, duration, "Success")
+        metrics.registreer(threading.current_thread().name, "Write", duration)
+        if PRINT_PER_OPERATIE:
+            print(f"Wrote {value} to {pad}")
+        log_to_csv(pad, "Write", value, duration, "Success")
     except Exception as e:
+        metrics.registreer(threading.current_thread().name, "Write", 0, ok=False)
         print(f"Write error: {e}")
-        log_to_csv(nodeid, "Write", value, 0, "Failed")
+        log_to_csv(pad, "Write", value, 0, "Failed")
 
 # === Simuleer HMI-belasting ===
 def simulate_hmi_load():
@@ -89,16 +126,17 @@ def simulate_hmi_load():
 
     def poll_thread():
         while not stop_event.is_set():
-            read_variable('ns=4;i=1110') # TestBool1
+            read_variable(TEST_BOOL1_PAD)
             time.sleep(0.5)
 
     def interaction_thread():
         while not stop_event.is_set():
-            write_variable('ns=4;i=1120', random.choice([True, False]), ua.VariantType.Boolean)  # TestBool2
+            write_variable(TEST_BOOL2_PAD, random.choice([True, False]), ua.VariantType.Boolean)
             time.sleep(random.uniform(1, 5))
 
-    threading.Thread(target=poll_thread, daemon=True).start()
-    threading.Thread(target=interaction_thread, daemon=True).start()
+    # Threadnaam = client-label in de live metrics
+    threading.Thread(target=poll_thread, name="hmi_poll", daemon=True).start()
+    threading.Thread(target=interaction_thread, name="hmi_interactie", daemon=True).start()
 
 # === Stress test (schrijft naar arrayelementen) ===
 def stress_test():
@@ -106,14 +144,12 @@ def stress_test():
 
     def stress_writer():
         while not stop_event.is_set():
-            for index in range(100):
-                nodeid_int = ARRAY_BASE_NODEID_START + index  # i = 17 + 0..99
-                nodeid = f"ns=4;i={nodeid_int}"
-                write_variable(nodeid, random.randint(0, 32767))
+            for pad in ARRAY_PADEN:
+                write_variable(pad, random.randint(0, 32767))
             time.sleep(0.01)
 
-    for _ in range(5):
-        threading.Thread(target=stress_writer, daemon=True).start()
+    for nummer in range(1, 6):
+        threading.Thread(target=stress_writer, name=f"stress_{nummer}", daemon=True).start()
 
 # === Timer en afhandeling ===
 def test_timer():
@@ -133,6 +169,15 @@ if __name__ == "__main__":
     print("Start OPC UA Performance Test")
 
     if connect_opc():
+        try:
+            nodes.update(resolve_nodes(client, [TEST_BOOL1_PAD, TEST_BOOL2_PAD] + ARRAY_PADEN))
+        except Exception as e:
+            print(f"Nodes opzoeken mislukt: {e}")
+            disconnect_opc()
+            raise SystemExit(1)
+        if CYCLETIME_MODUS:
+            cycletime = CycleTimeMonitor(client, CYCLETIME_MODUS).start()
+        metrics.start()
         simulate_hmi_load()
         stress_test()
         threading.Thread(target=test_timer, daemon=True).start()
@@ -143,6 +188,9 @@ if __name__ == "__main__":
         except KeyboardInterrupt:
             signal_handler(None, None)
 
+        if cycletime:
+            cycletime.stop()
+        metrics.stop()
         disconnect_opc()
         print(f"Resultaten opgeslagen in: {CSV_FILE}")
         print("Test volledig afgerond.")
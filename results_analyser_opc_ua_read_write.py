@@ -34,7 +34,7 @@ for systeem, map_path in base_dirs.items():
         latency_path = os.path.join(map_path, bestanden["latency"])
         cycle_path = os.path.join(map_path, bestanden["cycletime"])
 
-        if not os.path.exists(latency_path) or not os.path.exists(cycle_path):
+        if not os.path.exists(latency_path):
             print(f"[⏭️] Bestanden ontbreken: {systeem} - {scenario}")
             continue
 
@@ -47,6 +47,20 @@ for systeem, map_path in base_dirs.items():
             print(f"[❌] Fout bij inlezen latency: {latency_path}\n{e}")
             continue
 
+        # Cycletime in dezelfde log (CYCLETIME_MODUS in de testscripts): geen koppeling nodig
+        if "cycletime_ns" in df_lat.columns:
+            df_matched = df_lat.dropna(subset=["cycletime_ns"])[["round_trip_ms"]].copy()
+            df_matched["cycletime_ms"] = df_lat["cycletime_ns"].astype(float) / 1_000_000
+            df_matched["Systeem"] = systeem
+            df_matched["Scenario"] = scenario
+            alle_data.append(df_matched)
+            print(f"[✓] Cycletime uit latency-log: {systeem} - {scenario}")
+            continue
+
+        if not os.path.exists(cycle_path):
+            print(f"[⏭️] Bestanden ontbreken: {systeem} - {scenario}")
+            continue
+
         try:
             df_cyc = pd.read_csv(cycle_path, skiprows=1, header=None,
                                  names=["Sample", "tijd_unix_ms", "cycletime_ns"])
@@ -50,8 +50,15 @@ print("\n📊 Statistieken per client (tijden in seconden):")
 print(stat.round(4))
 
 # === Cycletime toevoegen? ===
+df_matched = None
 cycletime_path = os.path.join(RESULT_DIR, "cycletime.csv")
-if os.path.exists(cycletime_path):
+if "cycletime_ns" in df_all.columns and df_all["cycletime_ns"].notna().any():
+    # Cycletime in de client-logs zelf (CYCLETIME_MODUS in de testscripts): geen koppeling nodig
+    df_matched = df_all.dropna(subset=["cycletime_ns"])[["Client"]].copy()
+    df_matched["round_trip_ms"] = df_all["round_trip_s"] * 1000
+    df_matched["cycletime_ms"] = df_all["cycletime_ns"].astype(float) / 1_000_000
+    print("Cycletime uit de client-logs.")
+elif os.path.exists(cycletime_path):
     df_cycle = pd.read_csv(cycletime_path, header=None, skiprows=1, names=["Sample", "unix_ns", "cycletime_ns"])
     df_cycle["unix_ms"] = df_cycle["unix_ns"] / 1_000_000
     df_cycle["cycletime_ms"] = df_cycle["cycletime_ns"] / 1_000_000
@@ -69,7 +76,10 @@ if os.path.exists(cycletime_path):
         })
 
     df_matched = pd.DataFrame(matched)
+else:
+    print("Geen cycletime-log gevonden. Alleen latency geanalyseerd.")
 
+if df_matched is not None:
     # Scatterplot latency vs cycletime
     plt.figure(figsize=(12, 6))
     sns.scatterplot(data=df_matched, x="cycletime_ms", y="round_trip_ms", hue="Client", palette="tab10", alpha=0.6)
@@ -79,5 +89,3 @@ if os.path.exists(cycletime_path):
     plt.grid(True)
     plt.tight_layout()
     plt.show()
-else:
-    print("Geen cycletime-log gevonden. Alleen latency geanalyseerd.")
@@ -0,0 +1,263 @@
+import os
+import csv
+import time
+import random
+import datetime
+import threading
+import statistics
+from opcua import Client, ua
+from node_resolver import resolve_nodes
+from cryptography import x509
+from cryptography.x509.oid import NameOID, ExtendedKeyUsageOID
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# === OPC UA instellingen ===
+# Met LOKALE_SERVER = True wordt local_test_server.py met dezelfde certificaten
+# gestart; anders wordt OPC_SERVER (de PLC) gebruikt. Op de PLC moet het
+# client-certificaat uit CERT_DIR vertrouwd worden (TIA certificaatbeheer).
+OPC_SERVER = "opc.tcp://172.16.0.1:4840"
+LOKALE_SERVER = True
+LOKALE_ENDPOINT = "opc.tcp://127.0.0.1:48400"
+
+TEST_NODE_PAD = "DB.TestInt1"  # browse-paden, zie node_resolver.py
+ECHO_NODE_PAD = "DB.EchoInt1"
+ARRAY_PADEN = [f"DB.TestArray2[{index}]" for index in range(100)]
+
+# === Te vergelijken security-instellingen (policy, mode) ===
+# python-opcua ondersteunt geen Aes128_Sha256_RsaOaep/Aes256_Sha256_RsaPss;
+# Basic256Sha256 is de sterkste policy die hier gemeten kan worden.
+SECURITY_INSTELLINGEN = [
+    ("None", "None"),
+    ("Basic256Sha256", "Sign"),
+    ("Basic256Sha256", "SignAndEncrypt"),
+]
+
+# === Testinstellingen ===
+AANTAL_HANDSHAKES = 10         # aantal connect/disconnect-rondes voor de handshake-tijd
+AANTAL_METINGEN = 150          # echo (write + poll) per instelling
+MAX_POGINGEN = 50              # ruimer dan opc_ua_read_write_test.py: geen reset, dus hele PLC-cyclus pollen
+SLEEP_TUSSEN_POLL = 0.001
+STRESS_DUUR = 10               # seconden array-schrijvers per instelling
+STRESS_SCHRIJVERS = 5
+
+# === Certificaten en uitvoer ===
+CERT_DIR = "certs"
+CLIENT_APPLICATION_URI = "urn:OPC_UA_Test:benchmark:client"
+SERVER_APPLICATION_URI = "urn:OPC_UA_Test:standin"
+CSV_BESTAND = "opcua_security_benchmark.csv"
+
+
+# === Testcertificaten genereren ===
+def maak_certificaat(naam, application_uri, server):
+    """Maakt een zelfondertekend certificaat (DER) met private key (PEM) in CERT_DIR."""
+    cert_path = os.path.join(CERT_DIR, f"{naam}_cert.der")
+    key_path = os.path.join(CERT_DIR, f"{naam}_key.pem")
+    if os.path.exists(cert_path) and os.path.exists(key_path):
+        return cert_path, key_path
+
+    os.makedirs(CERT_DIR, exist_ok=True)
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    onderwerp = x509.Name([
+        x509.NameAttribute(NameOID.COMMON_NAME, f"OPC UA Test {naam}"),
+        x509.NameAttribute(NameOID.ORGANIZATION_NAME, "OPC UA Test"),
+    ])
+    nu = datetime.datetime.now(datetime.timezone.utc)
+    gebruik = ExtendedKeyUsageOID.SERVER_AUTH if server else ExtendedKeyUsageOID.CLIENT_AUTH
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(onderwerp)
+        .issuer_name(onderwerp)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(nu - datetime.timedelta(days=1))
+        .not_valid_after(nu + datetime.timedelta(days=365))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.UniformResourceIdentifier(application_uri),
+            x509.DNSName("localhost"),
+        ]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=False, path_length=None), critical=True)
+        .add_extension(x509.KeyUsage(
+            digital_signature=True, content_commitment=True, key_encipherment=True,
+            data_encipherment=True, key_agreement=False, key_cert_sign=False,
+            crl_sign=False, encipher_only=False, decipher_only=False,
+        ), critical=True)
+        .add_extension(x509.ExtendedKeyUsage([gebruik]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+
+    with open(cert_path, "wb") as file:
+        file.write(cert.public_bytes(serialization.Encoding.DER))
+    with open(key_path, "wb") as file:
+        file.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption(),
+        ))
+    print(f"[✓] Testcertificaat aangemaakt: {cert_path}")
+    return cert_path, key_path
+
+
+# === Client per security-instelling ===
+def maak_client(url, policy, mode, client_cert, client_key, server_cert):
+    client = Client(url)
+    client.application_uri = CLIENT_APPLICATION_URI
+    if policy != "None":
+        # Bij de PLC (server_cert None) wordt het servercertificaat uit de endpoints gehaald
+        security = f"{policy},{mode},{client_cert},{client_key}"
+        if server_cert:
+            security += f",{server_cert}"
+        client.set_security_string(security)
+    return client
+
+
+def meet_handshakes(maak):
+    """Tijd van connect(): OpenSecureChannel + CreateSession + ActivateSession."""
+    tijden = []
+    for _ in range(AANTAL_HANDSHAKES):
+        client = maak()
+        start = time.time()
+        client.connect()
+        tijden.append(time.time() - start)
+        client.disconnect()
+    return tijden
+
+
+def meet_echo(client):
+    """
+    Write + poll zoals opc_ua_read_write_test.py, maar zonder de reset naar -1
+    (elke meting schrijft een nieuwe waarde). Geeft (round-trip tijden, aantal timeouts).
+    """
+    nodes = resolve_nodes(client, [TEST_NODE_PAD, ECHO_NODE_PAD])
+    test_node = nodes[TEST_NODE_PAD]
+    echo_node = nodes[ECHO_NODE_PAD]
+    tijden = []
+    timeouts = 0
+    for meting in range(1, AANTAL_METINGEN + 1):
+        test_value = meting
+        start = time.time()
+        test_node.set_value(ua.DataValue(ua.Variant(test_value, ua.VariantType.Int16)))
+        for _ in range(MAX_POGINGEN):
+            if echo_node.get_value() == test_value:
+                tijden.append(time.time() - start)
+                break
+            time.sleep(SLEEP_TUSSEN_POLL)
+        else:
+            timeouts += 1
+    return tijden, timeouts
+
+
+def meet_stress(client):
+    """Array-schrijvers zoals in plc_attack.py; geeft (ops/s, responstijden, fouten)."""
+    tijden = []
+    fouten = [0]
+    lock = threading.Lock()
+    nodes = list(resolve_nodes(client, ARRAY_PADEN).values())
+    einde = time.time() + STRESS_DUUR
+
+    def stress_writer():
+        while time.time() < einde:
+            for node in nodes:
+                start = time.time()
+                try:
+                    node.set_value(ua.DataValue(ua.Variant(random.randint(0, 32767), ua.VariantType.Int16)))
+                    duur = time.time() - start
+                    with lock:
+                        tijden.append(duur)
+                except Exception:
+                    with lock:
+                        fouten[0] += 1
+
+    threads = [threading.Thread(target=stress_writer, daemon=True) for _ in range(STRESS_SCHRIJVERS)]
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return len(tijden) / (time.time() - start), tijden, fouten[0]
+
+
+def ms(waarden, functie):
+    return functie(waarden) * 1000 if waarden else float("nan")
+
+
+def p95(waarden):
+    return statistics.quantiles(waarden, n=20)[-1] if len(waarden) > 1 else waarden[0]
+
+
+# === Main ===
+if __name__ == "__main__":
+    client_cert, client_key = maak_certificaat("client", CLIENT_APPLICATION_URI, server=False)
+
+    stop_server = None
+    server_cert = None
+    url = OPC_SERVER
+    if LOKALE_SERVER:
+        from local_test_server import start_server
+
+        server_cert, server_key = maak_certificaat("server", SERVER_APPLICATION_URI, server=True)
+        policies = [getattr(ua.SecurityPolicyType, "NoSecurity" if p == "None" else f"{p}_{m}")
+                    for p, m in SECURITY_INSTELLINGEN]
+        stop_server = start_server(LOKALE_ENDPOINT, server_cert, server_key, policies)
+        url = LOKALE_ENDPOINT
+
+    resultaten = []
+    try:
+        for policy, mode in SECURITY_INSTELLINGEN:
+            naam = policy if policy == "None" else f"{policy} {mode}"
+            print(f"\n[→] {naam}")
+
+            def maak():
+                return maak_client(url, policy, mode, client_cert, client_key, server_cert)
+
+            try:
+                handshakes = meet_handshakes(maak)
+                client = maak()
+                client.connect()
+                try:
+                    echo, echo_timeouts = meet_echo(client)
+                    ops, stress, fouten = meet_stress(client)
+                finally:
+                    client.disconnect()
+            except Exception as e:
+                print(f"[✗] {naam} mislukt: {e}")
+                continue
+
+            resultaten.append({
+                "security": naam,
+                "handshake_ms": ms(handshakes, statistics.mean),
+                "echo_gem_ms": ms(echo, statistics.mean),
+                "echo_p95_ms": ms(echo, p95),
+                "echo_geslaagd": len(echo),
+                "echo_timeouts": echo_timeouts,
+                "stress_ops_s": ops,
+                "stress_gem_ms": ms(stress, statistics.mean),
+                "stress_fouten": fouten,
+            })
+            print(f"[✓] handshake {resultaten[-1]['handshake_ms']:.1f} ms, "
+                  f"echo {resultaten[-1]['echo_gem_ms']:.2f} ms, stress {ops:.0f} ops/s")
+    finally:
+        if stop_server:
+            stop_server()
+
+    if not resultaten:
+        print("❌ Geen resultaten.")
+    else:
+        basis = resultaten[0]
+        for r in resultaten:
+            r["echo_delta_ms"] = r["echo_gem_ms"] - basis["echo_gem_ms"]
+            r["stress_delta_pct"] = ((r["stress_ops_s"] / basis["stress_ops_s"] - 1) * 100
+                                     if basis["stress_ops_s"] else float("nan"))
+
+        with open(CSV_BESTAND, mode='w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(resultaten[0].keys()))
+            writer.writeheader()
+            writer.writerows(resultaten)
+        print(f"\n[✓] Resultaten opgeslagen in '{CSV_BESTAND}'")
+
+        print(f"\n## Security overhead t.o.v. {basis['security']}\n")
+        print("| Security | Handshake (ms) | Echo gem. (ms) | Echo p95 (ms) | Δ echo (ms) | Echo timeouts | Stress (ops/s) | Δ stress (%) | Fouten |")
+        print("|----------|----------------|----------------|---------------|-------------|---------------|----------------|--------------|--------|")
+        for r in resultaten:
+            print(f"| {r['security']} | {r['handshake_ms']:.1f} | {r['echo_gem_ms']:.2f} | {r['echo_p95_ms']:.2f} | "
+                  f"{r['echo_delta_ms']:+.2f} | {r['echo_timeouts']} | {r['stress_ops_s']:.0f} | {r['stress_delta_pct']:+.1f} | {r['stress_fouten']} |")